@@ -1,4 +1,7 @@
+import os
+import re
 import sys
+from functools import lru_cache
 from importlib import resources
 from pathlib import Path
 from types import TracebackType
@@ -7,11 +10,11 @@ from typing import Literal
 import PySide6.QtCore as Qc
 import PySide6.QtGui as Qg
 import PySide6.QtWidgets as Qw
+import shiboken6
 from loguru import logger
 
 import handtex.worker_thread as wt
 from handtex.data import color_themes, custom_icons
-from handtex.error_dialog_driver import ErrorDialog
 from handtex.utils import resource_path
 
 
@@ -19,6 +22,16 @@ from handtex.utils import resource_path
 MIN_MSG_LENGTH = 50
 
 
+def _pad(msg: str) -> str:
+    """
+    Pad the message with spaces up to the minimum message length.
+    Messages that are already long enough are returned as is.
+    """
+    if len(msg) >= MIN_MSG_LENGTH:
+        return msg
+    return msg + " " * (MIN_MSG_LENGTH - len(msg))
+
+
 class SelectableMessageBox(Qw.QMessageBox):
     """
     Subclass the QMessageBox to make the text selectable.
@@ -28,10 +41,6 @@ class SelectableMessageBox(Qw.QMessageBox):
         super(SelectableMessageBox, self).__init__(*args, **kwargs)
         self.setTextInteractionFlags(Qc.Qt.TextSelectableByMouse)
 
-        labels = self.findChildren(Qw.QLabel)
-        for label in labels:
-            label.setTextInteractionFlags(Qc.Qt.TextSelectableByMouse)
-
 
 def show_exception(
     parent,
@@ -60,34 +69,41 @@ def show_exception(
         exception_value: BaseException
         exception_traceback: TracebackType
 
-        if error_bundle is not None:
-            if isinstance(error_bundle, tuple):
-                exception_type, exception_value, exception_traceback = error_bundle
-            elif isinstance(error_bundle, wt.WorkerError):
-                exception_type = error_bundle.exception_type
-                exception_value = error_bundle.value
-                exception_traceback = error_bundle.traceback
-            else:
-                logger.error(f"Invalid error bundle: {error_bundle}")
+        match error_bundle:
+            case None:
+                exception_type, exception_value, exception_traceback = sys.exc_info()
+            case wt.WorkerError(
+                exception_type=exception_type,
+                value=exception_value,
+                traceback=exception_traceback,
+            ):
+                pass
+            case (exception_type, exception_value, exception_traceback):
+                pass
+            case _:
+                logger.error("Invalid error bundle: {}", error_bundle)
                 exception_type, exception_value, exception_traceback = sys.exc_info()
-        else:
-            exception_type, exception_value, exception_traceback = sys.exc_info()
 
         # Ignore the exception if it's a KeyboardInterrupt.
         if exception_type is KeyboardInterrupt:
             logger.warning("User interrupted the process.")
             return
 
+        # The depth attributes the record to our caller, the traceback comes from the exception.
         logger.opt(
             depth=1, exception=(exception_type, exception_value, exception_traceback)
         ).critical(msg)
 
+    # The error dialog and its generated ui are only needed once something went wrong,
+    # so defer importing them to keep them off the startup path.
+    from handtex.error_dialog_driver import ErrorDialog
+
     box = ErrorDialog(parent, title, msg)
     box.exec()
 
 
 def show_critical(parent, title: str, msg: str, **kwargs) -> int:
-    msg = msg.ljust(MIN_MSG_LENGTH)
+    msg = _pad(msg)
     box = SelectableMessageBox(
         Qw.QMessageBox.Critical,
         title,
@@ -99,27 +115,65 @@ def show_critical(parent, title: str, msg: str, **kwargs) -> int:
     return box.exec()
 
 
+# Message boxes that are kept around and reused by show_warning and show_info, keyed by icon.
+_shared_message_boxes: dict[Qw.QMessageBox.Icon, SelectableMessageBox] = {}
+
+
+def _exec_shared_message_box(
+    icon: Qw.QMessageBox.Icon, parent, title: str, msg: str, **kwargs
+) -> None:
+    """
+    Show a message box with an Ok button, reusing the same box for each icon across calls.
+    The box is only parented for the duration of the call, so that it doesn't get
+    deleted along with the parent later on. Should the parent be destroyed while the box
+    is open, Qt deletes the box too, and a new one is made on the next call.
+
+    :param icon: The icon of the message box.
+    :param parent: The parent widget.
+    :param title: The title of the dialog.
+    :param msg: The message to show.
+    :param kwargs: Extra properties for the message box. These would stick to a shared box,
+        so a one-off box is used instead when given.
+    """
+    if kwargs:
+        box = SelectableMessageBox(icon, title, msg, Qw.QMessageBox.Ok, parent, **kwargs)
+        box.exec()
+        return
+
+    box = _shared_message_boxes.get(icon)
+    if box is not None and not shiboken6.isValid(box):
+        # Qt deleted it along with a parent that was destroyed while the box was open.
+        del _shared_message_boxes[icon]
+        box = None
+    if box is None or box.isVisible():
+        # A visible box means we were called again while it is still open, so use a new one.
+        box = SelectableMessageBox(icon, "", "", Qw.QMessageBox.Ok)
+        _shared_message_boxes.setdefault(icon, box)
+
+    flags = box.windowFlags()
+    box.setParent(parent, flags)
+    box.setWindowTitle(title)
+    box.setText(msg)
+    try:
+        box.exec()
+    finally:
+        if shiboken6.isValid(box):
+            box.setParent(None, flags)
+
+
 def show_warning(parent, title: str, msg: str, **kwargs) -> None:
-    msg = msg.ljust(MIN_MSG_LENGTH)
-    box = SelectableMessageBox(
-        Qw.QMessageBox.Warning, title, msg, Qw.QMessageBox.Ok, parent, **kwargs
-    )
-    box.exec()
+    _exec_shared_message_box(Qw.QMessageBox.Warning, parent, title, _pad(msg), **kwargs)
 
 
 def show_info(parent, title: str, msg: str, **kwargs) -> None:
-    msg = msg.ljust(MIN_MSG_LENGTH)
-    box = SelectableMessageBox(
-        Qw.QMessageBox.Information, title, msg, Qw.QMessageBox.Ok, parent, **kwargs
-    )
-    box.exec()
+    _exec_shared_message_box(Qw.QMessageBox.Information, parent, title, _pad(msg), **kwargs)
 
 
 def show_question(
     parent, title: str, msg: str, buttons=Qw.QMessageBox.Yes | Qw.QMessageBox.Cancel
 ) -> int:
     # Note: Yes uses dialog-ok-apply, Cancel uses dialog-cancel.
-    msg = msg.ljust(MIN_MSG_LENGTH)
+    msg = _pad(msg)
     dlg = Qw.QMessageBox(parent)
     dlg.setWindowTitle(title)
     dlg.setText(msg)
@@ -132,7 +186,7 @@ def open_file(path: Path) -> None:
     """
     Open any given file with the default application.
     """
-    logger.debug(f"Opening file {path}")
+    logger.debug("Opening file {}", path)
     try:
         # Use Qt to open the file, so that it works on all platforms.
         Qg.QDesktopServices.openUrl(Qc.QUrl.fromLocalFile(str(path)))
@@ -170,134 +224,175 @@ section_role_mapping = {
     # Add more mappings as needed
 }
 
+# Flattened form of the above, keyed by (section, key), to resolve a role with a single lookup.
+_flat_role_mapping: dict[tuple[str, str], Qg.QPalette.ColorRole] = {
+    (section, key): role
+    for section, role_mapping in section_role_mapping.items()
+    for key, role in role_mapping.items()
+}
+
+
+# RGB triplet as parsed from a KDE color scheme file.
+RGB = tuple[int, int, int]
+
+# KDE color scheme values are written as "r,g,b".
+_rgb_pattern = re.compile(r"\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*")
+
+
+def _parse_rgb(value: str) -> RGB:
+    """
+    Parse a KDE color scheme value of the form "r,g,b".
+
+    :param value: The value to parse.
+    :return: The RGB triplet.
+    """
+    match = _rgb_pattern.fullmatch(value)
+    if match is None:
+        raise ValueError(f"Invalid color value: {value}")
+    return int(match[1]), int(match[2]), int(match[3])
+
 
-def clamp_8bit(value: int) -> int:
+@lru_cache(maxsize=8)
+def _parse_theme_file(
+    theme: str,
+) -> tuple[RGB, float, tuple[tuple[Qg.QPalette.ColorRole, RGB], ...]]:
     """
-    Clamp a value to the 0-255 range.
+    Read and parse the given theme file into plain python values.
+    Only immutable values are returned, so the result can be safely cached and shared.
+
+    :param theme: The name of the theme.
+    :return: The disabled effect color, the disabled contrast amount,
+        and the colors for each palette role, in file order.
     """
-    return max(0, min(value, 255))
+    file_path = resource_path(color_themes, theme)
+
+    try:
+        content = file_path.read_text(encoding="utf-8")
+    except OSError as e:
+        raise ValueError(f"Could not open theme file: {theme}") from e
+
+    # Walk the file once, collecting both the disabled color parameters
+    # and the palette colors. The disabled effect is applied later on, once all are known.
+    # This simple scanner is deliberate: configparser is implemented in pure python too and
+    # takes about four times as long on these files, while the result is cached anyway.
+    disabled_color: RGB = (128, 128, 128)  # Default to gray.
+    disabled_contrast_amount = 0.0
+    role_colors: list[tuple[Qg.QPalette.ColorRole, RGB]] = []
+    section = None
+    for line in map(str.strip, content.splitlines()):
+        if not line:
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1]
+            continue
+        key, separator, value = line.partition("=")
+        if not separator:
+            continue
+        key = key.strip()
+        value = value.strip()
+
+        if section == "ColorEffects:Disabled":
+            if key == "Color":
+                disabled_color = _parse_rgb(value)
+            elif key == "ContrastAmount":
+                disabled_contrast_amount = float(value)
+            continue
+
+        qt_color_role = _flat_role_mapping.get((section, key))
+        if qt_color_role is not None:
+            role_colors.append((qt_color_role, _parse_rgb(value)))
 
+    return disabled_color, disabled_contrast_amount, tuple(role_colors)
 
-def apply_color_effect(
-    source: Qg.QColor, effect_base: Qg.QColor, contrast_amount: float
-) -> Qg.QColor:
+
+def _average_color(a: Qg.QColor, b: Qg.QColor) -> Qg.QColor:
     """
-    Apply a color effect to a source color.
+    Average two colors, working on all channels of the packed RGB values at once.
+    The lowest bit of each channel is dropped first, so that no channel can carry into the next.
 
-    :param source: The source color.
-    :param effect_base: The base color for the effect.
-    :param contrast_amount: The amount of contrast to apply.
-    :return: The modified color.
+    :param a: The first color.
+    :param b: The second color.
+    :return: The opaque average color.
     """
-    # Essentially alpha blend, with the effect having the contrast amount as the alpha pasted on top.
-    r = clamp_8bit(int(source.red() * (1 - contrast_amount) + effect_base.red() * contrast_amount))
-    g = clamp_8bit(
-        int(source.green() * (1 - contrast_amount) + effect_base.green() * contrast_amount)
-    )
-    b = clamp_8bit(
-        int(source.blue() * (1 - contrast_amount) + effect_base.blue() * contrast_amount)
-    )
-    return Qg.QColor(r, g, b)
+    average = ((a.rgb() & 0xFEFEFE) + (b.rgb() & 0xFEFEFE)) >> 1
+    return Qg.QColor.fromRgb(average | 0xFF000000)
 
 
 def load_color_palette(theme: str) -> Qg.QPalette:
     """
     Provide a theme name and get a QPalette object.
     The name should match one of the files in the themes folder.
+    The parsed theme file is cached, but each call returns a fresh palette.
 
     :param theme: The name of the theme.
     :return: A QPalette object.
     """
     palette = Qg.QPalette()
 
-    file_path = resource_path(color_themes, theme)
+    disabled_rgb, disabled_contrast_amount, role_colors = _parse_theme_file(theme)
+
+    # The disabled colors are an alpha blend of each role's color with the theme's disabled color,
+    # using the contrast amount as the alpha. This is done in 8.8 fixed point, with the
+    # loop-invariant effect side of the blend computed once up front. With the alpha
+    # clamped to [0, 256], every channel is guaranteed to stay within [0, 255].
+    alpha = max(0, min(round(disabled_contrast_amount * 256), 256))
+    inv_alpha = 256 - alpha
+    dc_r, dc_g, dc_b = (channel * alpha for channel in disabled_rgb)
+
+    for qt_color_role, (r, g, b) in role_colors:
+        color = Qg.QColor(r, g, b)
+        palette.setColor(Qg.QPalette.Normal, qt_color_role, color)
+        palette.setColor(Qg.QPalette.Inactive, qt_color_role, color)
+        blended_disabled = Qg.QColor(
+            (r * inv_alpha + dc_r) >> 8, (g * inv_alpha + dc_g) >> 8, (b * inv_alpha + dc_b) >> 8
+        )
+        palette.setColor(Qg.QPalette.Disabled, qt_color_role, blended_disabled)
 
-    file = Qc.QFile(file_path)
-    if file.open(Qc.QFile.ReadOnly | Qc.QFile.Text):
-        stream = Qc.QTextStream(file)
-        content = stream.readAll()
-
-        # Find the disabled color parameters.
-        disabled_color = Qg.QColor.fromRgb(128, 128, 128)  # Default to gray.
-        disabled_contrast_amount = 0.0
-        in_disabled_section = False
-        for line in content.split("\n"):
-            line = line.strip()
-            if line == "[ColorEffects:Disabled]":
-                in_disabled_section = True
-                continue
-            if not in_disabled_section:
-                continue
-            if line.startswith("["):
-                in_disabled_section = False
-                break
-            if "=" not in line:
-                continue
-
-            # Ok, now we're in the disabled section.
-            key, value = map(str.strip, line.split("=", 1))
-            if key == "Color":
-                r, g, b = map(int, value.split(","))
-                disabled_color.setRgb(r, g, b)
-            elif key == "ContrastAmount":
-                disabled_contrast_amount = float(value)
+    # Fallback calculations for the roles the theme doesn't provide.
+    # These can't be detected with isValid(), since a fresh palette is a copy of the
+    # application palette, so instead check what the theme assigned.
+    assigned = {qt_color_role for qt_color_role, _ in role_colors}
 
-        section = None
-        for line in content.split("\n"):
-            line = line.strip()
-            if line.startswith("[") and line.endswith("]"):
-                section = line[1:-1]
-            elif "=" in line:
-                key, value = map(str.strip, line.split("=", 1))
-                role_mapping = section_role_mapping.get(section, {})
-                qt_color_role = role_mapping.get(key, None)
-                if qt_color_role is not None:
-                    r, g, b = map(int, value.split(","))
-                    palette.setColor(Qg.QPalette.Normal, qt_color_role, Qg.QColor(r, g, b))
-                    palette.setColor(Qg.QPalette.Inactive, qt_color_role, Qg.QColor(r, g, b))
-                    # Calculate the disabled color.
-                    disabled_color = apply_color_effect(
-                        Qg.QColor(r, g, b), disabled_color, disabled_contrast_amount
-                    )
-                    palette.setColor(Qg.QPalette.Disabled, qt_color_role, disabled_color)
-    else:
-        raise ValueError(f"Could not open theme file: {theme}")
-
-    # Fallback calculations
-    if not palette.color(Qg.QPalette.Light).isValid():
+    if Qg.QPalette.Light not in assigned:
         base = palette.color(Qg.QPalette.Button)
         palette.setColor(Qg.QPalette.Light, base.lighter(150))
 
-    if not palette.color(Qg.QPalette.Dark).isValid():
+    if Qg.QPalette.Dark not in assigned:
         base = palette.color(Qg.QPalette.Window)
         palette.setColor(Qg.QPalette.Dark, base.darker(150))
 
-    if not palette.color(Qg.QPalette.Midlight).isValid():
-        light = palette.color(Qg.QPalette.Light)
-        button = palette.color(Qg.QPalette.Button)
-        midlight = Qg.QColor(
-            (light.red() + button.red()) // 2,
-            (light.green() + button.green()) // 2,
-            (light.blue() + button.blue()) // 2,
+    if Qg.QPalette.Midlight not in assigned:
+        midlight = _average_color(
+            palette.color(Qg.QPalette.Light), palette.color(Qg.QPalette.Button)
         )
         palette.setColor(Qg.QPalette.Midlight, midlight)
 
-    if not palette.color(Qg.QPalette.Mid).isValid():
-        dark = palette.color(Qg.QPalette.Dark)
-        button = palette.color(Qg.QPalette.Button)
-        mid = Qg.QColor(
-            (dark.red() + button.red()) // 2,
-            (dark.green() + button.green()) // 2,
-            (dark.blue() + button.blue()) // 2,
-        )
+    if Qg.QPalette.Mid not in assigned:
+        mid = _average_color(palette.color(Qg.QPalette.Dark), palette.color(Qg.QPalette.Button))
         palette.setColor(Qg.QPalette.Mid, mid)
 
-    if not palette.color(Qg.QPalette.Shadow).isValid():
+    if Qg.QPalette.Shadow not in assigned:
         palette.setColor(Qg.QPalette.Shadow, Qg.QColor(0, 0, 0))
 
     return palette
 
 
+@lru_cache(maxsize=None)
+def _list_files(directory: str) -> frozenset[str]:
+    """
+    List the names of all files in the given directory, scanning it only once.
+    Names are normalized with os.path.normcase, so that they compare case-insensitively
+    on Windows, like the file system does.
+    A missing directory raises FileNotFoundError, which is not cached.
+
+    :param directory: The directory to scan.
+    :return: The normalized file names.
+    """
+    with os.scandir(directory) as entries:
+        return frozenset(os.path.normcase(entry.name) for entry in entries if entry.is_file())
+
+
+@lru_cache(maxsize=256)
 def custom_icon_path(icon_name: str, theme: Literal["dark", "light"] | str = "") -> Path:
     """
     Loads the given icon from the dark, light, or color-agnostic set of custom icons.
@@ -313,28 +408,45 @@ def custom_icon_path(icon_name: str, theme: Literal["dark", "light"] | str = "")
     if theme:
         custom_icon_dir = custom_icon_dir / theme
 
+    try:
+        file_names = _list_files(str(custom_icon_dir))
+    except FileNotFoundError:
+        file_names = frozenset()
+
     for extension in ("", ".svg", ".png"):
-        icon_path = custom_icon_dir / (icon_name + extension)
-        if icon_path.is_file():
-            return icon_path
+        if os.path.normcase(icon_name + extension) in file_names:
+            return custom_icon_dir / (icon_name + extension)
 
     raise FileNotFoundError(f"Failed to load '{custom_icon_dir / icon_name}'")
 
 
+# Cache for loaded custom icons, keyed by (icon_name, theme).
+# QIcons are implicitly shared by Qt, so handing out the same instance is safe.
+_icon_cache: dict[tuple[str, str], Qg.QIcon] = {}
+
+
 def load_custom_icon(icon_name: str, theme: Literal["dark", "light"] | str = "") -> Qg.QIcon:
     """
     Loads the given icon from the dark, light, or color-agnostic set of custom icons.
     File names may omit the extension, in which case .svg and .png are checked.
     If the file could not be found, a QIcon with a null pixmap is returned.
+    Loaded icons are cached, so repeated requests for the same icon are cheap.
 
     :param icon_name: The icon's filename, with or without extension.
     :param theme: Indicate if the icon should be pulled from the light or dark theme,
         if applicable, otherwise leave blank.
     :return: A QIcon that may have a null pixmap.
     """
+    cache_key = (icon_name, theme)
+    if cache_key in _icon_cache:
+        return _icon_cache[cache_key]
+
     try:
         icon_path = custom_icon_path(icon_name, theme)
-        return Qg.QIcon(str(icon_path))
     except FileNotFoundError as e:
         logger.error(e)
         return Qg.QIcon()
+
+    icon = Qg.QIcon(str(icon_path))
+    _icon_cache[cache_key] = icon
+    return icon
@@ -33,15 +33,23 @@ def main() -> None:
     logger.remove()
     ut.get_log_path().parent.mkdir(parents=True, exist_ok=True)
 
+    # Variable values in tracebacks (diagnose) are only worth their cost when debugging,
+    # so they are left out of the log file and the regular console output.
     # When bundling an executable, stdout can be None if no console is supplied.
     if sys.stdout is not None:
         if args.debug:
             logger.add(sys.stdout, level="DEBUG")
         else:
-            logger.add(sys.stdout, level="WARNING")
+            logger.add(sys.stdout, level="WARNING", diagnose=False)
 
     # Log up to 10MB to the log file.
-    logger.add(str(ut.get_log_path()), rotation="10 MB", retention="1 week", level="DEBUG")
+    logger.add(
+        str(ut.get_log_path()),
+        rotation="10 MB",
+        retention="1 week",
+        level="DEBUG",
+        diagnose=False,
+    )
 
     # Set up a preliminary exception handler so that this still shows up in the log.
     # Once the gui is up and running it'll be replaced with a call to the gui's error dialog.
@@ -0,0 +1,153 @@
+import PySide6.QtCore as Qc
+import PySide6.QtGui as Qg
+import PySide6.QtWidgets as Qw
+import shiboken6
+
+import handtex.gui_utils as gu
+import handtex.utils as ut
+
+
+def test_load_color_palette_disabled_colors():
+    """
+    Test that every disabled color is blended against the theme's disabled color,
+    not against the disabled color of a previously parsed role.
+    """
+    for theme, _ in ut.get_available_themes():
+        palette = gu.load_color_palette(theme)
+        disabled_rgb, contrast_amount, role_colors = gu._parse_theme_file(theme)
+
+        assert role_colors
+        for role, rgb in role_colors:
+            assert palette.color(Qg.QPalette.Normal, role).getRgb()[:3] == rgb
+            assert palette.color(Qg.QPalette.Inactive, role).getRgb()[:3] == rgb
+
+            expected = [
+                source * (1 - contrast_amount) + effect * contrast_amount
+                for source, effect in zip(rgb, disabled_rgb)
+            ]
+            actual = palette.color(Qg.QPalette.Disabled, role).getRgb()[:3]
+            for expected_channel, actual_channel in zip(expected, actual):
+                # Allow for rounding in the fixed point blend.
+                assert abs(expected_channel - actual_channel) <= 1
+
+
+def test_load_color_palette_fresh_instance():
+    """
+    Test that the cached theme data still yields independent palettes.
+    """
+    palette = gu.load_color_palette("breeze")
+    palette.setColor(Qg.QPalette.Window, Qg.QColor(1, 2, 3))
+
+    assert gu.load_color_palette("breeze").color(Qg.QPalette.Window) != Qg.QColor(1, 2, 3)
+
+
+def test_load_color_palette_derived_roles():
+    """
+    Test that roles missing from the theme are derived from the theme's colors,
+    instead of being inherited from the application palette.
+    """
+    palette = gu.load_color_palette("breeze-dark")
+
+    button = palette.color(Qg.QPalette.Button)
+    window = palette.color(Qg.QPalette.Window)
+    assert palette.color(Qg.QPalette.Light) == button.lighter(150)
+    assert palette.color(Qg.QPalette.Dark) == window.darker(150)
+    assert palette.color(Qg.QPalette.Shadow) == Qg.QColor(0, 0, 0)
+    # The averaged roles must lie between their two source colors.
+    assert button.lightness() <= palette.color(Qg.QPalette.Midlight).lightness()
+    assert palette.color(Qg.QPalette.Mid).lightness() <= button.lightness()
+
+
+def test_load_custom_icon_miss():
+    """
+    Test that a missing icon yields a null icon, without caching the miss.
+    """
+    icon = gu.load_custom_icon("no-such-icon")
+
+    assert icon.isNull()
+    assert ("no-such-icon", "") not in gu._icon_cache
+
+
+def test_custom_icon_path():
+    """
+    Test resolving custom icons, with and without extension and theme.
+    """
+    assert gu.custom_icon_path("logo").name == "logo.svg"
+    assert gu.custom_icon_path("logo.ico").name == "logo.ico"
+    assert gu.custom_icon_path("stroke2", "dark").name == "stroke2.svg"
+    assert gu.custom_icon_path("stroke2", "dark").parent.name == "dark"
+
+    try:
+        gu.custom_icon_path("no-such-icon")
+    except FileNotFoundError:
+        pass
+    else:
+        assert False, "Expected a FileNotFoundError for a missing icon."
+
+
+def exec_with_modal_handler(handler, func, *args, **kwargs) -> None:
+    """
+    Call a function that opens a modal dialog, letting the handler act on the dialog.
+    Without this, exec() would block forever when running offscreen.
+    The handler is called with the active modal widget until it closes it.
+    """
+    timer = Qc.QTimer()
+
+    def poll() -> None:
+        dialog = Qw.QApplication.activeModalWidget()
+        if dialog is not None:
+            handler(dialog)
+
+    timer.timeout.connect(poll)
+    timer.start(10)
+    try:
+        func(*args, **kwargs)
+    finally:
+        timer.stop()
+
+
+def test_shared_message_box():
+    """
+    Test that show_info reuses its message box, except for one-off boxes with extra properties,
+    and that it recovers when the parent is destroyed while the box is open.
+    """
+    app = Qw.QApplication.instance() or Qw.QApplication([])
+    shown: list[tuple[Qw.QMessageBox, str, str, bool]] = []
+
+    def accept(dialog: Qw.QMessageBox) -> None:
+        shown.append(
+            (dialog, dialog.windowTitle(), dialog.detailedText(), dialog.parent() is not None)
+        )
+        dialog.accept()
+
+    parent = Qw.QWidget()
+    exec_with_modal_handler(accept, gu.show_info, parent, "First", "first")
+    exec_with_modal_handler(accept, gu.show_info, None, "Second", "second")
+    first_box, second_box = shown[0][0], shown[1][0]
+
+    # Reused, parented only while open.
+    assert first_box is second_box
+    assert first_box is gu._shared_message_boxes[Qw.QMessageBox.Information]
+    assert [entry[1] for entry in shown] == ["First", "Second"]
+    assert shown[0][3]
+    assert first_box.parent() is None
+
+    # Extra properties get a one-off box, leaving the shared one untouched.
+    exec_with_modal_handler(accept, gu.show_info, parent, "Third", "third", detailedText="details")
+    assert shown[2][0] is not first_box
+    assert shown[2][2] == "details"
+    assert gu._shared_message_boxes[Qw.QMessageBox.Information] is first_box
+    assert first_box.detailedText() == ""
+
+    # Destroying the parent while the box is open takes the box with it.
+    def delete_parent(dialog: Qw.QMessageBox) -> None:
+        if dialog.parent() is not None:
+            dialog.parent().deleteLater()
+
+    exec_with_modal_handler(delete_parent, gu.show_info, parent, "Fourth", "fourth")
+    assert not shiboken6.isValid(first_box)
+
+    # The dead box must not break later calls.
+    exec_with_modal_handler(accept, gu.show_info, None, "Fifth", "fifth")
+    assert shown[-1][1] == "Fifth"
+    assert shiboken6.isValid(gu._shared_message_boxes[Qw.QMessageBox.Information])